@@ -108,6 +108,10 @@ def _contains_any(text: str, keywords: Sequence[str]) -> bool:
 
 
 def validate_rule(rule: Dict[str, Any], *, eligibility_text: str) -> Tuple[bool, str]:
+    return _validate_rule(rule, eligibility_norm=_norm_text(eligibility_text))
+
+
+def _validate_rule(rule: Dict[str, Any], *, eligibility_norm: str) -> Tuple[bool, str]:
     rule_type = str(rule.get("type") or "").strip().upper()
     if rule_type not in ALLOWED_TYPES:
         return False, "invalid_type"
@@ -121,7 +125,7 @@ def validate_rule(rule: Dict[str, Any], *, eligibility_text: str) -> Tuple[bool,
         return False, "missing_evidence"
 
     evidence_norm = _norm_text(evidence)
-    if evidence_norm.strip() not in _norm_text(eligibility_text):
+    if evidence_norm.strip() not in eligibility_norm:
         return False, "evidence_not_in_text"
 
     value = rule.get("value")
@@ -185,6 +189,7 @@ def build_dataset(raw_rows: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, An
         if not isinstance(labeled_rules, list):
             labeled_rules = []
 
+        eligibility_norm = _norm_text(eligibility_text)
         kept: List[Dict[str, Any]] = []
         for rule in labeled_rules:
             if not isinstance(rule, dict):
@@ -192,7 +197,7 @@ def build_dataset(raw_rows: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, An
                 total_rules += 1
                 continue
             total_rules += 1
-            ok, reason = validate_rule(rule, eligibility_text=eligibility_text)
+            ok, reason = _validate_rule(rule, eligibility_norm=eligibility_norm)
             if ok:
                 kept.append(rule)
                 kept_rules += 1
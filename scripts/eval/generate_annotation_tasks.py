@@ -8,6 +8,11 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 
+def _normalize_id(value: Any) -> str:
+    # null must stay empty so _validate_relevance_rows still rejects the row.
+    return "" if value is None else str(value).strip()
+
+
 def _load_rows(path: Path) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
     with path.open("r", encoding="utf-8") as handle:
@@ -21,6 +26,9 @@ def _load_rows(path: Path) -> List[Dict[str, Any]]:
                 raise ValueError(f"{path}:{line_no} invalid json: {exc}") from exc
             if not isinstance(payload, dict):
                 raise ValueError(f"{path}:{line_no} row must be a JSON object")
+            # Normalize identifiers once so task generation can use them as-is.
+            payload["query_id"] = _normalize_id(payload.get("query_id"))
+            payload["nct_id"] = _normalize_id(payload.get("nct_id"))
             rows.append(payload)
     return rows
 
@@ -50,10 +58,8 @@ def generate_retrieval_tasks(
     target_pairs: int,
     guideline_version: str = "m4-v1",
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    annotated_pairs = {
-        (str(row["query_id"]).strip(), str(row["nct_id"]).strip())
-        for row in rows
-    }
+    """Expects rows with ids already normalized by _load_rows."""
+    annotated_pairs = {(row["query_id"], row["nct_id"]) for row in rows}
     query_ids = sorted({query_id for query_id, _ in annotated_pairs})
     nct_ids = sorted({nct_id for _, nct_id in annotated_pairs})
 
@@ -96,7 +102,8 @@ def generate_parsing_tasks(
     target_trials: int,
     guideline_version: str = "m4-v1",
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    nct_counts = Counter(str(row["nct_id"]).strip() for row in rows)
+    """Expects rows with ids already normalized by _load_rows."""
+    nct_counts = Counter(row["nct_id"] for row in rows)
     ranked_nct_ids = sorted(nct_counts.items(), key=lambda item: (-item[1], item[0]))
     selected = ranked_nct_ids[:target_trials]
 
@@ -27,16 +27,25 @@ THRESHOLDS = {
 }
 
 
-def _retrieve_relevant_pairs(
+def _index_relevance_by_query(
     relevance_index: Dict[Tuple[str, str], int],
-    query_id: str,
+) -> Dict[str, List[Tuple[str, int]]]:
+    by_query: Dict[str, List[Tuple[str, int]]] = {}
+    for (qid, nct_id), label in relevance_index.items():
+        by_query.setdefault(qid, []).append((nct_id, label))
+    return by_query
+
+
+def _retrieve_relevant_pairs(
+    query_pairs: List[Tuple[str, int]],
     threshold: int,
     allowed_nct_ids: set[str],
 ) -> List[Tuple[str, int]]:
-    relevant: List[Tuple[str, int]] = []
-    for (qid, nct_id), label in relevance_index.items():
-        if qid == query_id and label >= threshold and nct_id in allowed_nct_ids:
-            relevant.append((nct_id, label))
+    relevant = [
+        (nct_id, label)
+        for nct_id, label in query_pairs
+        if label >= threshold and nct_id in allowed_nct_ids
+    ]
     relevant.sort(key=lambda item: (-item[1], item[0]))
     return relevant
 
@@ -49,9 +58,10 @@ def analyze_retrieval_errors(
     top_k: int,
     relevance_threshold: int,
     sample_limit: int = 10,
-) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+) -> Tuple[Counter[str], List[Dict[str, Any]]]:
     error_counts: Counter[str] = Counter()
     samples: List[Dict[str, Any]] = []
+    relevance_by_query = _index_relevance_by_query(relevance_index)
     for query in queries:
         query_id = str(query.get("query_id") or "").strip()
         if not query_id:
@@ -61,7 +71,7 @@ def analyze_retrieval_errors(
         top_ids = ranked_nct_ids[:top_k]
         top_labels = [int(relevance_index.get((query_id, nct_id), 0)) for nct_id in top_ids]
         relevant_pairs = _retrieve_relevant_pairs(
-            relevance_index, query_id, relevance_threshold, allowed_nct_ids
+            relevance_by_query.get(query_id, []), relevance_threshold, allowed_nct_ids
         )
         has_relevant = len(relevant_pairs) > 0
         hit_topk = any(label >= relevance_threshold for label in top_labels)
@@ -94,7 +104,7 @@ def analyze_retrieval_errors(
                     }
                 )
 
-    return dict(error_counts), samples
+    return error_counts, samples
 
 
 def _index_rules(rules: List[Dict[str, Any]]) -> Dict[Tuple[str, str, str, str, str], Dict[str, Any]]:
@@ -107,7 +117,7 @@ def analyze_parsing_errors(
     predicted_rules_by_trial: Dict[str, List[Dict[str, Any]]],
     *,
     sample_limit: int = 10,
-) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+) -> Tuple[Counter[str], List[Dict[str, Any]]]:
     error_counts: Counter[str] = Counter()
     samples: List[Dict[str, Any]] = []
     text_by_trial = {
@@ -164,11 +174,19 @@ def analyze_parsing_errors(
                     }
                 )
 
+        if not predicted_rules:
+            continue
         eligibility_norm = _norm_text(text_by_trial.get(trial_id, ""))
+        # Rules parsed from the same sentence share evidence; scan the text once per snippet.
+        evidence_found: Dict[str, bool] = {}
         for rule in predicted_rules:
             evidence = _norm_text(str(rule.get("evidence_text") or ""))
-            if evidence and evidence in eligibility_norm:
-                continue
+            if evidence:
+                found = evidence_found.get(evidence)
+                if found is None:
+                    found = evidence_found[evidence] = evidence in eligibility_norm
+                if found:
+                    continue
             error_counts["hallucinated_evidence"] += 1
             if len(samples) < sample_limit:
                 samples.append(
@@ -180,7 +198,7 @@ def analyze_parsing_errors(
                     }
                 )
 
-    return dict(error_counts), samples
+    return error_counts, samples
 
 
 def _metric_status(name: str, value: float) -> str:
@@ -357,9 +375,7 @@ def generate_report(
         sample_limit=error_sample_limit,
     )
 
-    merged_errors: Counter[str] = Counter()
-    merged_errors.update(retrieval_errors)
-    merged_errors.update(parsing_errors)
+    merged_errors = retrieval_errors + parsing_errors
     merged_samples = retrieval_samples + parsing_samples
     merged_samples = merged_samples[:error_sample_limit]
 
@@ -373,7 +389,7 @@ def generate_report(
         "metrics": metrics,
         "error_summary": dict(merged_errors),
         "error_samples": merged_samples,
-        "recommendations": build_recommendations(metrics, dict(merged_errors)),
+        "recommendations": build_recommendations(metrics, merged_errors),
     }
     return report
 
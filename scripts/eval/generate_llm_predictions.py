@@ -2,12 +2,15 @@
 from __future__ import annotations
 
 import argparse
+import copy
 import json
 import os
 import sys
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Callable, Dict, List, Optional, Set, TextIO, Tuple
 
 
 def load_jsonl(path: Path) -> List[Dict[str, Any]]:
@@ -27,23 +30,24 @@ def load_jsonl(path: Path) -> List[Dict[str, Any]]:
     return rows
 
 
-def append_jsonl(path: Path, rows: Iterable[Dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as handle:
-        for row in rows:
-            handle.write(json.dumps(row, ensure_ascii=False))
-            handle.write("\n")
+def write_jsonl_row(handle: TextIO, row: Dict[str, Any]) -> None:
+    handle.write(json.dumps(row, ensure_ascii=False))
+    handle.write("\n")
+    # Flush per row so an interrupted run can be picked up with --resume.
+    handle.flush()
 
 
-def load_existing_predictions(path: Path) -> Dict[str, Dict[str, Any]]:
+def _nct_id(row: Dict[str, Any]) -> str:
+    value = row.get("nct_id")
+    if isinstance(value, str):
+        return value.strip()
+    return str(value or "").strip()
+
+
+def load_existing_ids(path: Path) -> Set[str]:
     if not path.exists():
-        return {}
-    existing: Dict[str, Dict[str, Any]] = {}
-    for row in load_jsonl(path):
-        nct_id = str(row.get("nct_id") or "").strip()
-        if nct_id:
-            existing[nct_id] = row
-    return existing
+        return set()
+    return {nct_id for nct_id in map(_nct_id, load_jsonl(path)) if nct_id}
 
 
 def _import_llm_parser():
@@ -60,6 +64,42 @@ def _safe_int(value: Any) -> int:
     return value if isinstance(value, int) else 0
 
 
+def _parse_trial(
+    parse_fn: Callable[[str], Tuple[List[Dict[str, Any]], Dict[str, Any]]],
+    text: str,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Optional[str]]:
+    try:
+        rules, metadata = parse_fn(text)
+    except Exception as exc:  # pragma: no cover - defensive path for live runs
+        return (
+            [],
+            {
+                "parser_source": "error",
+                "fallback_used": True,
+                "fallback_reason": str(exc),
+                "llm_usage": None,
+            },
+            str(exc),
+        )
+    return rules, metadata, None
+
+
+def _copy_parsed(
+    rules: List[Dict[str, Any]], metadata: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    # Reused results must not share rule ids (or objects) with the trial
+    # they were parsed for; give each copied rule a fresh id like the parser.
+    copied_rules = copy.deepcopy(rules)
+    for rule in copied_rules:
+        if isinstance(rule, dict) and "id" in rule:
+            rule["id"] = f"rule-{uuid.uuid4()}"
+    copied_metadata = copy.deepcopy(metadata)
+    # No LLM call was made for this row; keep per-row usage sums honest.
+    copied_metadata["llm_usage"] = None
+    copied_metadata["reused_from_text_cache"] = True
+    return copied_rules, copied_metadata
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Generate predicted parsing rules using llm_v1 with fallback."
@@ -73,8 +113,17 @@ def main() -> None:
         action="store_true",
         help="Skip nct_ids already present in output file.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Concurrent parser calls; output keeps input order.",
+    )
     args = parser.parse_args()
 
+    if args.workers < 1:
+        raise ValueError("--workers must be >= 1")
+
     if args.model.strip():
         os.environ["OPENAI_MODEL"] = args.model.strip()
 
@@ -85,14 +134,14 @@ def main() -> None:
         trials = trials[: args.limit]
 
     output_path = Path(args.output)
-    existing = load_existing_predictions(output_path) if args.resume else {}
-    skip_ids = set(existing.keys())
+    skip_ids = load_existing_ids(output_path) if args.resume else set()
 
     stats: Dict[str, Any] = {
         "trial_count": len(trials),
         "already_present": len(skip_ids),
         "processed": 0,
         "written": 0,
+        "reused_by_text": 0,
         "source_llm_v1": 0,
         "source_rule_v1": 0,
         "fallback_count": 0,
@@ -102,61 +151,83 @@ def main() -> None:
         "elapsed_sec": 0.0,
     }
 
-    start = time.time()
+    pending: List[Tuple[int, str, str]] = []
     for idx, row in enumerate(trials, start=1):
-        nct_id = str(row.get("nct_id") or "").strip()
+        nct_id = _nct_id(row)
         if not nct_id:
             continue
         if nct_id in skip_ids:
             continue
+        pending.append((idx, nct_id, str(row.get("eligibility_text") or "")))
 
-        text = str(row.get("eligibility_text") or "")
-        error_message = None
-        try:
-            rules, metadata = parse_criteria_llm_v1_with_fallback(text)
-        except Exception as exc:  # pragma: no cover - defensive path for live runs
-            rules = []
-            metadata = {
-                "parser_source": "error",
-                "fallback_used": True,
-                "fallback_reason": str(exc),
-                "llm_usage": None,
-            }
-            error_message = str(exc)
-
-        source = str(metadata.get("parser_source") or "")
-        if source == "llm_v1":
-            stats["source_llm_v1"] += 1
-        elif source == "rule_v1":
-            stats["source_rule_v1"] += 1
-        if metadata.get("fallback_used"):
-            stats["fallback_count"] += 1
-        if error_message:
-            stats["error_count"] += 1
-
-        usage = metadata.get("llm_usage") or {}
-        stats["token_usage_total"] += _safe_int(usage.get("total_tokens"))
-        stats["rule_count"] += len(rules)
-        stats["processed"] += 1
-
-        append_jsonl(
-            output_path,
-            [
-                {
-                    "nct_id": nct_id,
-                    "predicted_rules": rules,
-                    "parser_metadata": metadata,
-                }
-            ],
-        )
-        stats["written"] += 1
+    # Trials sharing eligibility text (e.g. sibling studies) are parsed once.
+    unique_texts = list(dict.fromkeys(text for _, _, text in pending))
+    parsed_by_text: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]] = {}
+    failed_texts: Set[str] = set()
 
-        print(
-            f"[{idx}/{len(trials)}] nct_id={nct_id} "
-            f"source={source or 'unknown'} fallback={bool(metadata.get('fallback_used'))} "
-            f"rules={len(rules)}",
-            flush=True,
+    start = time.time()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    try:
+        results = executor.map(
+            lambda text: _parse_trial(parse_criteria_llm_v1_with_fallback, text),
+            unique_texts,
         )
+        with output_path.open("a", encoding="utf-8") as handle:
+            for idx, nct_id, text in pending:
+                error_message: Optional[str] = None
+                if text in parsed_by_text:
+                    rules, metadata = _copy_parsed(*parsed_by_text[text])
+                    stats["reused_by_text"] += 1
+                else:
+                    if text in failed_texts:
+                        # Do not copy a (possibly transient) failure to sibling
+                        # trials; parse again for this one.
+                        rules, metadata, error_message = _parse_trial(
+                            parse_criteria_llm_v1_with_fallback, text
+                        )
+                    else:
+                        # unique_texts follows first-occurrence order, so the next result is ours.
+                        rules, metadata, error_message = next(results)
+                    if error_message:
+                        failed_texts.add(text)
+                    else:
+                        parsed_by_text[text] = (rules, metadata)
+                    usage = metadata.get("llm_usage") or {}
+                    stats["token_usage_total"] += _safe_int(usage.get("total_tokens"))
+
+                source = str(metadata.get("parser_source") or "")
+                if source == "llm_v1":
+                    stats["source_llm_v1"] += 1
+                elif source == "rule_v1":
+                    stats["source_rule_v1"] += 1
+                if metadata.get("fallback_used"):
+                    stats["fallback_count"] += 1
+                if error_message:
+                    stats["error_count"] += 1
+
+                stats["rule_count"] += len(rules)
+                stats["processed"] += 1
+
+                write_jsonl_row(
+                    handle,
+                    {
+                        "nct_id": nct_id,
+                        "predicted_rules": rules,
+                        "parser_metadata": metadata,
+                    },
+                )
+                stats["written"] += 1
+
+                print(
+                    f"[{idx}/{len(trials)}] nct_id={nct_id} "
+                    f"source={source or 'unknown'} fallback={bool(metadata.get('fallback_used'))} "
+                    f"rules={len(rules)}",
+                    flush=True,
+                )
+    finally:
+        # Do not keep spending LLM calls on queued trials after an interrupt.
+        executor.shutdown(cancel_futures=True)
 
     stats["elapsed_sec"] = round(time.time() - start, 2)
     print(json.dumps(stats, ensure_ascii=False, indent=2))
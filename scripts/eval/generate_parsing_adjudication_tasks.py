@@ -2,9 +2,10 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from typing import AbstractSet, Any, Dict, Iterable, List, Sequence, Tuple
 
 from compute_parsing_agreement import index_rules_by_nct, load_jsonl, rule_signature
 
@@ -37,19 +38,18 @@ def _index_original_rules(rows: Sequence[Dict[str, Any]]) -> Dict[str, Dict[Rule
         for rule in rules:
             if not isinstance(rule, dict):
                 continue
-            signature = rule_signature(rule)
-            if signature not in bucket:
-                bucket[signature] = rule
+            bucket.setdefault(rule_signature(rule), rule)
         out[nct_id] = bucket
     return out
 
 
 def _sorted_rules_from_signatures(
-    signatures: Iterable[RuleSig],
+    signatures: AbstractSet[RuleSig],
     original_map: Dict[RuleSig, Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
-    for signature in sorted(set(signatures)):
+    # Sorting keeps task files stable across runs (set order depends on hash seed).
+    for signature in sorted(signatures):
         rule = original_map.get(signature)
         if rule is None:
             rows.append(
@@ -67,6 +67,14 @@ def _sorted_rules_from_signatures(
     return rows
 
 
+def _rank_key(item: Dict[str, Any]) -> Tuple[float, int, str]:
+    return (
+        float(item["jaccard"]),
+        -int(item["a_only_rule_count"] + item["b_only_rule_count"]),
+        str(item["nct_id"]),
+    )
+
+
 def build_parsing_adjudication_tasks(
     *,
     a_rows: Sequence[Dict[str, Any]],
@@ -118,16 +126,10 @@ def build_parsing_adjudication_tasks(
             }
         )
 
-    ranked = sorted(
-        candidates,
-        key=lambda item: (
-            float(item["jaccard"]),
-            -int(item["a_only_rule_count"] + item["b_only_rule_count"]),
-            str(item["nct_id"]),
-        ),
-    )
     if max_trials > 0:
-        ranked = ranked[:max_trials]
+        ranked = heapq.nsmallest(max_trials, candidates, key=_rank_key)
+    else:
+        ranked = sorted(candidates, key=_rank_key)
 
     out_rows: List[Dict[str, Any]] = []
     for idx, row in enumerate(ranked, start=1):
@@ -2,13 +2,14 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
+import shutil
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
 
 
-def load_jsonl(path: Path) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
     with path.open("r", encoding="utf-8") as handle:
         for line_no, line in enumerate(handle, start=1):
             raw = line.strip()
@@ -20,8 +21,11 @@ def load_jsonl(path: Path) -> List[Dict[str, Any]]:
                 raise ValueError(f"{path}:{line_no} invalid json: {exc}") from exc
             if not isinstance(payload, dict):
                 raise ValueError(f"{path}:{line_no} row must be a JSON object")
-            rows.append(payload)
-    return rows
+            yield payload
+
+
+def load_jsonl(path: Path) -> List[Dict[str, Any]]:
+    return list(iter_jsonl(path))
 
 
 def dump_jsonl(path: Path, rows: Iterable[Dict[str, Any]]) -> None:
@@ -32,27 +36,36 @@ def dump_jsonl(path: Path, rows: Iterable[Dict[str, Any]]) -> None:
             handle.write("\n")
 
 
-def dump_json(path: Path, payload: Dict[str, Any]) -> None:
+def dump_json(path: Path, payload: Dict[str, Any]) -> str:
+    """Write payload as indented JSON and return the serialized text."""
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    path.write_text(text + "\n", encoding="utf-8")
+    return text
 
 
 def load_release_nct_ids(path: Path) -> Set[str]:
-    rows = load_jsonl(path)
+    # Only nct_id is needed; stream rows so full trial payloads are not kept around.
     nct_ids: Set[str] = set()
-    for row in rows:
+    for row in iter_jsonl(path):
         nct_id = str(row.get("nct_id") or "").strip()
         if nct_id:
             nct_ids.add(nct_id)
     return nct_ids
 
 
+def _candidate_rank_key(item: Tuple[str, int]) -> Tuple[int, str]:
+    nct_id, support_count = item
+    return (-support_count, nct_id)
+
+
 def build_blind_candidates(
     pending_rows: Sequence[Dict[str, Any]],
     *,
     release_nct_ids: Set[str],
+    max_candidates: int = 0,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    deduped: Dict[str, Dict[str, Any]] = {}
+    best_support: Dict[str, int] = {}
     excluded_overlap = 0
     invalid_rows = 0
 
@@ -71,24 +84,24 @@ def build_blind_candidates(
         except (TypeError, ValueError):
             support_count = 0
 
-        candidate = {
-            "nct_id": nct_id,
-            "query_support_count": max(support_count, 0),
-        }
-        existing = deduped.get(nct_id)
-        if existing is None or candidate["query_support_count"] > existing["query_support_count"]:
-            deduped[nct_id] = candidate
-
-    candidates = sorted(
-        deduped.values(),
-        key=lambda item: (-int(item["query_support_count"]), str(item["nct_id"])),
-    )
+        support_count = max(support_count, 0)
+        if support_count > best_support.get(nct_id, -1):
+            best_support[nct_id] = support_count
+
+    if max_candidates > 0:
+        ranked = heapq.nsmallest(max_candidates, best_support.items(), key=_candidate_rank_key)
+    else:
+        ranked = sorted(best_support.items(), key=_candidate_rank_key)
+    candidates = [
+        {"nct_id": nct_id, "query_support_count": support_count}
+        for nct_id, support_count in ranked
+    ]
 
     manifest = {
         "input_rows": len(pending_rows),
         "invalid_rows": invalid_rows,
         "excluded_release_overlap_rows": excluded_overlap,
-        "unique_candidates": len(candidates),
+        "unique_candidates": len(best_support),
     }
     return candidates, manifest
 
@@ -174,6 +187,7 @@ def main() -> None:
     candidates, candidate_manifest = build_blind_candidates(
         pending_rows,
         release_nct_ids=release_nct_ids,
+        max_candidates=args.target_trials,
     )
     tasks, task_manifest = build_blind_tasks(
         candidates,
@@ -186,8 +200,11 @@ def main() -> None:
     output_b = Path(args.output_annotator_b)
     output_manifest = Path(args.output_manifest)
 
+    # Both annotators get the same task list; serialize once and copy.
     dump_jsonl(output_a, tasks)
-    dump_jsonl(output_b, tasks)
+    if output_b.resolve() != output_a.resolve():
+        output_b.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(output_a, output_b)
 
     manifest = {
         "source_pending": args.pending,
@@ -200,9 +217,7 @@ def main() -> None:
         "output_annotator_a": str(output_a),
         "output_annotator_b": str(output_b),
     }
-    dump_json(output_manifest, manifest)
-
-    print(json.dumps(manifest, ensure_ascii=False, indent=2))
+    print(dump_json(output_manifest, manifest))
 
 
 if __name__ == "__main__":
@@ -27,12 +27,15 @@ def _collect_rule_stats(trials: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
         rules = trial.get("labeled_rules")
         if not isinstance(rules, list):
             rules = []
-        valid_rules = [rule for rule in rules if isinstance(rule, dict)]
-        per_trial_rule_counts.append(len(valid_rules))
-        total_rules += len(valid_rules)
-        for rule in valid_rules:
+        rule_count = 0
+        for rule in rules:
+            if not isinstance(rule, dict):
+                continue
+            rule_count += 1
             field = str(rule.get("field") or "").strip().lower() or "unknown"
             field_counter[field] += 1
+        per_trial_rule_counts.append(rule_count)
+        total_rules += rule_count
 
     if per_trial_rule_counts:
         min_rules = min(per_trial_rule_counts)
@@ -119,9 +122,12 @@ def render_markdown(report: Dict[str, Any]) -> str:
     return "\n".join(lines) + "\n"
 
 
-def dump_json(path: Path, payload: Dict[str, Any]) -> None:
+def dump_json(path: Path, payload: Dict[str, Any]) -> str:
+    """Write payload as indented JSON and return the serialized text."""
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    path.write_text(text + "\n", encoding="utf-8")
+    return text
 
 
 def main() -> None:
@@ -149,8 +155,7 @@ def main() -> None:
     output_md.parent.mkdir(parents=True, exist_ok=True)
     output_md.write_text(render_markdown(report), encoding="utf-8")
 
-    dump_json(Path(args.output_json), report)
-    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(dump_json(Path(args.output_json), report))
 
 
 if __name__ == "__main__":
@@ -58,22 +58,33 @@ def _pair_key(row: Dict[str, Any]) -> Tuple[str, str]:
     )
 
 
-def _validate_rows(labels: Sequence[Dict[str, Any]], tasks: Sequence[Dict[str, Any]]) -> None:
-    for idx, row in enumerate(labels, start=1):
-        query_id, nct_id = _pair_key(row)
-        if not query_id or not nct_id:
-            raise ValueError(f"labels[{idx}] missing query_id/nct_id")
-        label = row.get("relevance_label")
-        if isinstance(label, bool) or not isinstance(label, int) or label not in {0, 1, 2}:
-            raise ValueError(f"labels[{idx}] invalid relevance_label: {label}")
-
-    for idx, row in enumerate(tasks, start=1):
-        query_id, nct_id = _pair_key(row)
-        if not query_id or not nct_id:
-            raise ValueError(f"tasks[{idx}] missing query_id/nct_id")
-        task_id = str(row.get("task_id") or "").strip()
-        if not task_id:
-            raise ValueError(f"tasks[{idx}] missing task_id")
+def _add_selected_row(
+    selected: Dict[Tuple[str, str], Dict[str, Any]],
+    reason_counts: Counter[str],
+    row: Dict[str, Any],
+    reason: str,
+) -> None:
+    key = row["_pair"]
+    if not key[0] or not key[1]:
+        return
+    entry = selected.get(key)
+    if entry is None:
+        entry = selected[key] = {
+            "query_id": key[0],
+            "nct_id": key[1],
+            "source_task_id": row["_task_id"],
+            "source_band": row["_task_band"] or None,
+            "heuristic_score": round(float(row["_heuristic_score"]), 4),
+            "relevance_label_b": int(row["relevance_label"]),
+            "rationale_b": str(row.get("rationale") or "").strip(),
+            "selection_reasons": [],
+            "status": "PENDING",
+            "target_annotator": "annotator_a",
+            "guideline_version": "m4-v1",
+        }
+    if reason not in entry["selection_reasons"]:
+        entry["selection_reasons"].append(reason)
+        reason_counts[reason] += 1
 
 
 def build_adjudication_tasks(
@@ -86,19 +97,35 @@ def build_adjudication_tasks(
     if likely2_label1_per_query < 0:
         raise ValueError("likely2_label1_per_query must be >= 0")
 
-    _validate_rows(labels, tasks)
-    task_by_pair = {_pair_key(row): row for row in tasks}
+    task_by_pair: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for idx, row in enumerate(tasks, start=1):
+        pair = _pair_key(row)
+        if not pair[0] or not pair[1]:
+            raise ValueError(f"tasks[{idx}] missing query_id/nct_id")
+        if not str(row.get("task_id") or "").strip():
+            raise ValueError(f"tasks[{idx}] missing task_id")
+        task_by_pair[pair] = row
 
     joined: List[Dict[str, Any]] = []
     missing_task_meta = 0
-    for label_row in labels:
+    for idx, label_row in enumerate(labels, start=1):
         pair = _pair_key(label_row)
+        if not pair[0] or not pair[1]:
+            raise ValueError(f"labels[{idx}] missing query_id/nct_id")
+        label = label_row.get("relevance_label")
+        if isinstance(label, bool) or not isinstance(label, int) or label not in {0, 1, 2}:
+            raise ValueError(f"labels[{idx}] invalid relevance_label: {label}")
         task_row = task_by_pair.get(pair)
         if task_row is None:
             missing_task_meta += 1
             continue
+        # Keep only the fields the selection steps read instead of copying
+        # the whole label row.
         merged = {
-            **label_row,
+            "query_id": label_row["query_id"],
+            "relevance_label": label,
+            "rationale": label_row.get("rationale"),
+            "_pair": pair,
             "_task_id": str(task_row.get("task_id") or "").strip(),
             "_task_band": str(task_row.get("band") or "").strip(),
             "_heuristic_score": float(task_row.get("heuristic_score") or 0.0),
@@ -108,38 +135,16 @@ def build_adjudication_tasks(
     selected: Dict[Tuple[str, str], Dict[str, Any]] = {}
     reason_counts: Counter[str] = Counter()
 
-    def add_row(row: Dict[str, Any], reason: str) -> None:
-        key = _pair_key(row)
-        if not key[0] or not key[1]:
-            return
-        if key not in selected:
-            selected[key] = {
-                "query_id": key[0],
-                "nct_id": key[1],
-                "source_task_id": row["_task_id"],
-                "source_band": row["_task_band"] or None,
-                "heuristic_score": round(float(row["_heuristic_score"]), 4),
-                "relevance_label_b": int(row["relevance_label"]),
-                "rationale_b": str(row.get("rationale") or "").strip(),
-                "selection_reasons": [],
-                "status": "PENDING",
-                "target_annotator": "annotator_a",
-                "guideline_version": "m4-v1",
-            }
-        if reason not in selected[key]["selection_reasons"]:
-            selected[key]["selection_reasons"].append(reason)
-            reason_counts[reason] += 1
-
     # 1) Include all label=2 rows.
     for row in joined:
         if int(row["relevance_label"]) == 2:
-            add_row(row, "label_2")
+            _add_selected_row(selected, reason_counts, row, "label_2")
 
     # 2) Include all explicitly ambiguous task_ids.
     if ambiguous_task_ids:
         for row in joined:
             if row["_task_id"] in ambiguous_task_ids:
-                add_row(row, "annotator_ambiguous")
+                _add_selected_row(selected, reason_counts, row, "annotator_ambiguous")
 
     # 3) Include likely_2 but labeled as 1 (calibration candidates), capped per query.
     by_query: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
@@ -156,7 +161,7 @@ def build_adjudication_tasks(
             key=lambda item: (-float(item["_heuristic_score"]), str(item["_task_id"])),
         )
         for row in candidates[:likely2_label1_per_query]:
-            add_row(row, "likely2_labeled1")
+            _add_selected_row(selected, reason_counts, row, "likely2_labeled1")
 
     out_rows = sorted(
         selected.values(),
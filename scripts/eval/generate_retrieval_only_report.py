@@ -6,7 +6,7 @@ import json
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Sequence
+from typing import Any, Dict, List, Sequence, Tuple
 
 from compute_relevance_agreement import (
     VALID_LABELS,
@@ -44,22 +44,27 @@ def _validate_rows(rows: Sequence[Dict[str, Any]], *, source: str) -> None:
             raise ValueError(f"{source}[{idx}] invalid relevance_label: {label}")
 
 
-def _label_distribution(rows: Sequence[Dict[str, Any]]) -> Dict[str, int]:
-    counts = Counter(int(row["relevance_label"]) for row in rows)
-    return {str(label): counts.get(label, 0) for label in sorted(VALID_LABELS)}
-
-
-def _query_breakdown(rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    by_query: Dict[str, List[int]] = defaultdict(list)
+def _summarize_rows(
+    rows: Sequence[Dict[str, Any]],
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    label_counts: Counter[int] = Counter()
+    nct_ids: set[str] = set()
+    # query_id -> [pair_count, relevant_count_ge1, relevant_count_eq2]
+    by_query: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
     for row in rows:
-        by_query[str(row["query_id"])].append(int(row["relevance_label"]))
+        label = int(row["relevance_label"])
+        label_counts[label] += 1
+        nct_ids.add(str(row["nct_id"]))
+        counts = by_query[str(row["query_id"])]
+        counts[0] += 1
+        if label >= 1:
+            counts[1] += 1
+        if label == 2:
+            counts[2] += 1
 
     breakdown: List[Dict[str, Any]] = []
     for query_id in sorted(by_query):
-        labels = by_query[query_id]
-        total = len(labels)
-        rel = sum(1 for label in labels if label >= 1)
-        strict = sum(1 for label in labels if label == 2)
+        total, rel, strict = by_query[query_id]
         breakdown.append(
             {
                 "query_id": query_id,
@@ -69,25 +74,23 @@ def _query_breakdown(rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
                 "relevant_rate_ge1": round(rel / total, 4) if total else 0.0,
             }
         )
-    return breakdown
 
-
-def _overall_summary(rows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
-    query_ids = {str(row["query_id"]) for row in rows}
-    nct_ids = {str(row["nct_id"]) for row in rows}
     total = len(rows)
-    label_counts = _label_distribution(rows)
-    rel_ge1 = int(label_counts["1"]) + int(label_counts["2"])
-    rel_eq2 = int(label_counts["2"])
-    return {
+    query_count = len(by_query)
+    rel_ge1 = label_counts[1] + label_counts[2]
+    rel_eq2 = label_counts[2]
+    dataset = {
         "total_pairs": total,
-        "query_count": len(query_ids),
+        "query_count": query_count,
         "nct_count": len(nct_ids),
-        "avg_pairs_per_query": round((total / len(query_ids)), 4) if query_ids else 0.0,
-        "label_distribution": label_counts,
+        "avg_pairs_per_query": round((total / query_count), 4) if query_count else 0.0,
+        "label_distribution": {
+            str(label): label_counts.get(label, 0) for label in sorted(VALID_LABELS)
+        },
         "relevant_rate_ge1": round((rel_ge1 / total), 4) if total else 0.0,
         "relevant_rate_eq2": round((rel_eq2 / total), 4) if total else 0.0,
     }
+    return dataset, breakdown
 
 
 def _agreement_summary(
@@ -112,11 +115,20 @@ def _agreement_summary(
             "confusion": {f"{i}->{j}": 0 for i in sorted(VALID_LABELS) for j in sorted(VALID_LABELS)},
         }
 
-    a_vals = [a_labels[key] for key in overlap]
-    b_vals = [b_labels[key] for key in overlap]
-    exact = sum(1 for x, y in zip(a_vals, b_vals) if x == y)
-    overlap_a = {key: a_labels[key] for key in overlap}
-    overlap_b = {key: b_labels[key] for key in overlap}
+    a_vals: List[int] = []
+    b_vals: List[int] = []
+    overlap_a: Dict[Tuple[str, str], int] = {}
+    overlap_b: Dict[Tuple[str, str], int] = {}
+    exact = 0
+    for key in overlap:
+        a_val = a_labels[key]
+        b_val = b_labels[key]
+        a_vals.append(a_val)
+        b_vals.append(b_val)
+        overlap_a[key] = a_val
+        overlap_b[key] = b_val
+        if a_val == b_val:
+            exact += 1
     return {
         "overlap_pairs": len(overlap),
         "only_in_a": only_a,
@@ -134,11 +146,12 @@ def build_report(
 ) -> Dict[str, Any]:
     rows_a = _load_rows(annotator_a_path)
     _validate_rows(rows_a, source="annotator_a")
+    dataset, query_breakdown = _summarize_rows(rows_a)
 
     report: Dict[str, Any] = {
         "generated_at_utc": datetime.now(timezone.utc).isoformat(),
-        "dataset": _overall_summary(rows_a),
-        "query_breakdown": _query_breakdown(rows_a),
+        "dataset": dataset,
+        "query_breakdown": query_breakdown,
         "agreement": None,
     }
     if annotator_b_path is not None:
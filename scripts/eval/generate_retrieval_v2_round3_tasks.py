@@ -60,15 +60,19 @@ def _pair_key(row: Dict[str, Any]) -> Tuple[str, str]:
     )
 
 
+def _collect_pairs(rows: Iterable[Dict[str, Any]], pairs: set[Tuple[str, str]]) -> None:
+    for row in rows:
+        query_id, nct_id = _pair_key(row)
+        if query_id and nct_id:
+            pairs.add((query_id, nct_id))
+
+
 def load_excluded_pairs(paths: Sequence[Path]) -> set[Tuple[str, str]]:
     excluded: set[Tuple[str, str]] = set()
     for path in paths:
         if not path.exists():
             continue
-        for row in load_jsonl(path):
-            query_id, nct_id = _pair_key(row)
-            if query_id and nct_id:
-                excluded.add((query_id, nct_id))
+        _collect_pairs(load_jsonl(path), excluded)
     return excluded
 
 
@@ -102,7 +106,8 @@ def determine_focus_queries(
 
     if explicit_focus_queries:
         requested = [item.strip() for item in explicit_focus_queries if item.strip()]
-        missing = [query_id for query_id in requested if query_id not in pending_queries]
+        pending_query_set = set(pending_queries)
+        missing = [query_id for query_id in requested if query_id not in pending_query_set]
         if missing:
             raise ValueError(f"focus queries absent from pending rows: {missing}")
         return requested, label2_counts
@@ -253,10 +258,12 @@ def build_targeted_batch(
     if not task_id_prefix.strip():
         raise ValueError("task_id_prefix must be non-empty")
 
-    reference_pair_count = len({_pair_key(row) for row in reference_rows if _pair_key(row) != ("", "")})
-    by_query: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    reference_pair_count = len({pair for pair in map(_pair_key, reference_rows) if pair != ("", "")})
+    # query_id -> band -> candidates, in global candidate order.
+    by_query: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
     deduped_pending = 0
 
+    focus_query_set = set(focus_queries)
     seen_pairs: set[Tuple[str, str]] = set()
     for row in _sort_candidates(pending_rows):
         query_id, nct_id = _pair_key(row)
@@ -267,12 +274,18 @@ def build_targeted_batch(
             continue
         seen_pairs.add(pair)
         deduped_pending += 1
-        if query_id in focus_queries:
-            candidate = dict(row)
-            band = str(candidate.get("band") or "hard_negative")
+        if query_id in focus_query_set:
+            # Rows are copied into batch_rows below; only copy here when the
+            # band has to be rewritten so pending_rows is left untouched.
+            candidate = row
+            band = str(row.get("band") or "hard_negative")
             if band not in VALID_BANDS:
-                candidate["band"] = "hard_negative"
-            by_query[query_id].append(candidate)
+                band = "hard_negative"
+                candidate = {**row, "band": band}
+            by_band = by_query.get(query_id)
+            if by_band is None:
+                by_band = by_query[query_id] = {name: [] for name in VALID_BANDS}
+            by_band[band].append(candidate)
 
     selected: List[Dict[str, Any]] = []
     query_summary: Dict[str, Any] = {}
@@ -283,27 +296,23 @@ def build_targeted_batch(
     }
 
     for query_id in focus_queries:
-        pool = by_query.get(query_id, [])
-        by_band: Dict[str, List[Dict[str, Any]]] = {
-            "likely_2": [],
-            "likely_1": [],
-            "hard_negative": [],
-        }
-        for row in pool:
-            by_band[str(row.get("band") or "hard_negative")].append(row)
-        for band in VALID_BANDS:
-            by_band[band] = _sort_candidates(by_band[band])
-
+        by_band = by_query.get(query_id) or {name: [] for name in VALID_BANDS}
+        available = 0
         picked: List[Dict[str, Any]] = []
+        fallback: List[Dict[str, Any]] = []
         for band in VALID_BANDS:
-            take = min(quota_map[band], len(by_band[band]))
-            picked.extend(by_band[band][:take])
-            by_band[band] = by_band[band][take:]
+            band_rows = by_band[band]
+            available += len(band_rows)
+            take = min(quota_map[band], len(band_rows))
+            picked.extend(band_rows[:take])
+            fallback.extend(band_rows[take:])
 
         remaining_slots = max(target_per_query - len(picked), 0)
-        fallback = by_band["likely_2"] + by_band["likely_1"] + by_band["hard_negative"]
         picked.extend(fallback[:remaining_slots])
-        picked = _sort_candidates(picked)[:target_per_query]
+        if len(picked) > target_per_query:
+            # Quotas can add up to more than target_per_query; keep the best.
+            # Otherwise order does not matter since selected is sorted below.
+            picked = _sort_candidates(picked)[:target_per_query]
 
         picked_counts: Dict[str, int] = defaultdict(int)
         for row in picked:
@@ -312,7 +321,7 @@ def build_targeted_batch(
 
         query_summary[query_id] = {
             "label2_count_in_reference": label2_counts.get(query_id, 0),
-            "available_after_exclusion": len(pool),
+            "available_after_exclusion": available,
             "picked": len(picked),
             "picked_band_counts": dict(sorted(picked_counts.items())),
             "shortfall": max(target_per_query - len(picked), 0),
@@ -410,19 +419,23 @@ def main() -> None:
 
     pending_rows = load_jsonl(Path(args.pending))
     queries = load_jsonl(Path(args.queries))
-    reference_rows = load_jsonl(Path(args.reference_labels))
+    reference_path = Path(args.reference_labels)
+    reference_rows = load_jsonl(reference_path)
     query_by_id = {
         str(row.get("query_id") or "").strip(): row
         for row in queries
         if str(row.get("query_id") or "").strip()
     }
 
-    exclude_paths: List[Path] = [Path(args.reference_labels)]
+    exclude_paths: List[Path] = []
     for item in args.exclude:
         path = Path(item)
-        if path not in exclude_paths:
+        if path != reference_path and path not in exclude_paths:
             exclude_paths.append(path)
+    # Reference labels are always excluded; reuse the rows loaded above
+    # instead of parsing the file a second time.
     excluded_pairs = load_excluded_pairs(exclude_paths)
+    _collect_pairs(reference_rows, excluded_pairs)
 
     focus_queries, label2_counts = determine_focus_queries(
         pending_rows=pending_rows,
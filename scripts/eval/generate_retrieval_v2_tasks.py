@@ -2,9 +2,13 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
+import tempfile
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
@@ -248,29 +252,41 @@ def _has_expected_location(expected_location: Dict[str, Any]) -> bool:
     )
 
 
+def _split_keywords(keywords: Sequence[str]) -> Tuple[frozenset[str], Tuple[str, ...]]:
+    tokens: set[str] = set()
+    phrases: List[str] = []
+    for keyword in keywords:
+        normalized = _norm_text(keyword)
+        if not normalized:
+            continue
+        if " " in normalized:
+            phrases.append(normalized)
+        else:
+            tokens.add(normalized)
+    return frozenset(tokens), tuple(phrases)
+
+
+# Markers and lexicons are normalized once here rather than per trial.
+# Single-word keywords must match a whole trial token; multi-word keywords
+# match as substrings of the normalized trial text.
+_INTENT_QUERY_MARKERS_NORM = {
+    intent: tuple(_norm_text(marker) for marker in markers)
+    for intent, markers in INTENT_QUERY_MARKERS.items()
+}
+_INTENT_KEYWORDS = {
+    intent: _split_keywords(lexicon) for intent, lexicon in INTENT_LEXICONS.items()
+}
+
+
 def _extract_query_intents(query: Dict[str, Any]) -> List[str]:
     query_text = _norm_text(str(query.get("query") or ""))
     intents: List[str] = []
-    for intent, markers in INTENT_QUERY_MARKERS.items():
-        if any(_norm_text(marker) in query_text for marker in markers):
+    for intent, markers in _INTENT_QUERY_MARKERS_NORM.items():
+        if any(marker in query_text for marker in markers):
             intents.append(intent)
     return intents
 
 
-def _contains_token_or_phrase(
-    *,
-    keyword: str,
-    text_norm: str,
-    tokens: set[str],
-) -> bool:
-    normalized = _norm_text(keyword)
-    if not normalized:
-        return False
-    if " " in normalized:
-        return normalized in text_norm
-    return normalized in tokens
-
-
 def _intent_match_count(
     intent_targets: Sequence[str],
     *,
@@ -279,14 +295,9 @@ def _intent_match_count(
 ) -> int:
     matched = 0
     for intent in intent_targets:
-        lexicon = INTENT_LEXICONS.get(intent, ())
-        if any(
-            _contains_token_or_phrase(
-                keyword=keyword,
-                text_norm=trial_text_norm,
-                tokens=trial_tokens,
-            )
-            for keyword in lexicon
+        keyword_tokens, keyword_phrases = _INTENT_KEYWORDS.get(intent, (frozenset(), ()))
+        if not keyword_tokens.isdisjoint(trial_tokens) or any(
+            phrase in trial_text_norm for phrase in keyword_phrases
         ):
             matched += 1
     return matched
@@ -395,6 +406,43 @@ def _extract_study_summary(study: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     }
 
 
+def _cache_path(cache_dir: Path, url: str, params: Dict[str, str]) -> Path:
+    key = json.dumps([url, sorted(params.items())], ensure_ascii=False)
+    return cache_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+
+def _read_cache(path: Path, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+    try:
+        if time.time() - path.stat().st_mtime >= ttl_seconds:
+            return None
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _write_cache(path: Path, payload: Dict[str, Any]) -> None:
+    # The cache is best-effort: a failed write must not fail the fetch, and
+    # must not leave a stray temp file behind.
+    tmp_name: Optional[str] = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so concurrent workers never read a
+        # partially written entry.
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+        ) as handle:
+            tmp_name = handle.name
+            json.dump(payload, handle, ensure_ascii=False)
+        os.replace(tmp_name, path)
+    except OSError:
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
 def _request_json(
     *,
     client: httpx.Client,
@@ -403,8 +451,17 @@ def _request_json(
     params: Dict[str, str],
     max_retries: int = 3,
     backoff_seconds: float = 0.4,
+    cache_dir: Optional[Path] = None,
+    cache_ttl_seconds: float = 0.0,
 ) -> Dict[str, Any]:
     url = f"{base_url.rstrip('/')}{path}"
+    cache_path: Optional[Path] = None
+    if cache_dir is not None:
+        cache_path = _cache_path(cache_dir, url, params)
+        cached = _read_cache(cache_path, cache_ttl_seconds)
+        if cached is not None:
+            return cached
+
     last_error: Optional[Exception] = None
     for attempt in range(max_retries):
         try:
@@ -419,6 +476,8 @@ def _request_json(
             payload = response.json()
             if not isinstance(payload, dict):
                 raise ValueError("CTGov response is not JSON object")
+            if cache_path is not None:
+                _write_cache(cache_path, payload)
             return payload
         except (httpx.RequestError, httpx.HTTPStatusError, ValueError) as exc:
             last_error = exc
@@ -432,55 +491,61 @@ def _request_json(
 def fetch_query_candidates(
     *,
     query: Dict[str, Any],
+    client: httpx.Client,
     base_url: str,
-    timeout_seconds: float,
     page_size: int,
     page_limit_per_term: int,
     max_candidates_per_query: int,
+    cache_dir: Optional[Path] = None,
+    cache_ttl_seconds: float = 0.0,
 ) -> List[Dict[str, Any]]:
     terms = build_search_terms(query)
     studies_by_nct: Dict[str, Dict[str, Any]] = {}
     term_hits: Dict[str, List[str]] = defaultdict(list)
 
-    with httpx.Client(timeout=timeout_seconds) as client:
-        for term in terms:
-            page_token: Optional[str] = None
-            for _ in range(page_limit_per_term):
-                params = {
-                    "query.term": term,
-                    "pageSize": str(page_size),
-                }
-                if page_token:
-                    params["pageToken"] = page_token
-                payload = _request_json(
-                    client=client,
-                    base_url=base_url,
-                    path="/studies",
-                    params=params,
-                )
-                studies = payload.get("studies")
-                if not isinstance(studies, list):
-                    studies = []
-                for study in studies:
-                    if not isinstance(study, dict):
-                        continue
-                    summary = _extract_study_summary(study)
-                    if not summary:
-                        continue
-                    nct_id = summary["nct_id"]
-                    if nct_id not in studies_by_nct:
-                        studies_by_nct[nct_id] = summary
-                    if term not in term_hits[nct_id]:
-                        term_hits[nct_id].append(term)
-
-                if len(studies_by_nct) >= max_candidates_per_query:
-                    break
-                next_token = payload.get("nextPageToken")
-                if not isinstance(next_token, str) or not next_token.strip():
-                    break
-                page_token = next_token
+    for term in terms:
+        page_token: Optional[str] = None
+        for _ in range(page_limit_per_term):
+            params = {
+                "query.term": term,
+                "pageSize": str(page_size),
+            }
+            if page_token:
+                params["pageToken"] = page_token
+            payload = _request_json(
+                client=client,
+                base_url=base_url,
+                path="/studies",
+                params=params,
+                cache_dir=cache_dir,
+                cache_ttl_seconds=cache_ttl_seconds,
+            )
+            studies = payload.get("studies")
+            if not isinstance(studies, list):
+                studies = []
+            for study in studies:
+                if not isinstance(study, dict):
+                    continue
+                summary = _extract_study_summary(study)
+                if not summary:
+                    continue
+                nct_id = summary["nct_id"]
+                if nct_id not in studies_by_nct:
+                    studies_by_nct[nct_id] = summary
+                # Terms are fetched one at a time, so a repeat hit for the
+                # current term can only be the last entry.
+                hits = term_hits[nct_id]
+                if not hits or hits[-1] != term:
+                    hits.append(term)
+
             if len(studies_by_nct) >= max_candidates_per_query:
                 break
+            next_token = payload.get("nextPageToken")
+            if not isinstance(next_token, str) or not next_token.strip():
+                break
+            page_token = next_token
+        if len(studies_by_nct) >= max_candidates_per_query:
+            break
 
     candidates = list(studies_by_nct.values())
     for candidate in candidates:
@@ -488,15 +553,18 @@ def fetch_query_candidates(
     return candidates
 
 
-def _location_match_score(
-    expected_location: Dict[str, Any], locations: Sequence[Dict[str, str]]
-) -> int:
-    if not isinstance(expected_location, dict) or not locations:
-        return 0
+def _expected_location_norms(expected_location: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (
+        _normalize_country(str(expected_location.get("country") or "")),
+        _normalize_state(str(expected_location.get("state") or "")),
+        _norm_text(str(expected_location.get("city") or "")),
+    )
 
-    country = _normalize_country(str(expected_location.get("country") or ""))
-    state = _normalize_state(str(expected_location.get("state") or ""))
-    city = _norm_text(str(expected_location.get("city") or ""))
+
+def _match_location_norms(
+    expected: Tuple[str, str, str], locations: Sequence[Dict[str, str]]
+) -> int:
+    country, state, city = expected
     score = 0
 
     if country:
@@ -511,37 +579,69 @@ def _location_match_score(
     return score
 
 
-def score_trial_for_query(
-    query: Dict[str, Any], trial: Dict[str, Any]
-) -> Tuple[float, str, Dict[str, Any]]:
+def build_query_context(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Query-side scoring inputs, computed once and reused for every trial."""
     expected_conditions = [
         item
         for item in (query.get("expected_conditions") or [])
         if isinstance(item, str) and item.strip()
     ]
     expected_condition_norms = [_norm_text(item) for item in expected_conditions]
-    expected_phase = str(query.get("expected_phase") or "").strip().upper()
-    expected_status = str(query.get("expected_status") or "").strip().upper()
     expected_location = query.get("expected_location") or {}
-    intent_targets = _extract_query_intents(query)
+    return {
+        "expected_condition_norms": expected_condition_norms,
+        "expected_condition_tokens": [_tokenize(cond) for cond in expected_condition_norms],
+        "query_tokens": _tokenize(str(query.get("query") or "")),
+        "expected_phase": str(query.get("expected_phase") or "").strip().upper(),
+        "expected_status": str(query.get("expected_status") or "").strip().upper(),
+        "expected_location_norms": (
+            _expected_location_norms(expected_location)
+            if isinstance(expected_location, dict)
+            else None
+        ),
+        "has_expected_location": _has_expected_location(expected_location),
+        "intent_targets": _extract_query_intents(query),
+    }
+
 
+def _trial_text_features(trial: Dict[str, Any]) -> Tuple[str, set[str]]:
     trial_title = str(trial.get("title") or "")
     trial_conditions = " ".join(str(item) for item in (trial.get("conditions") or []))
-    trial_text = f"{trial_title} {trial_conditions}"
-    trial_text_norm = _norm_text(trial_text)
-    trial_tokens = _tokenize(trial_text)
+    trial_text_norm = _norm_text(f"{trial_title} {trial_conditions}")
+    # Same tokens as _tokenize(), without normalizing the text a second time.
+    trial_tokens = {token for token in trial_text_norm.split() if len(token) > 2}
+    return trial_text_norm, trial_tokens
+
+
+def score_trial_for_query(
+    query: Dict[str, Any],
+    trial: Dict[str, Any],
+    *,
+    query_context: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, str, Dict[str, Any]]:
+    context = query_context if query_context is not None else build_query_context(query)
+    expected_phase = context["expected_phase"]
+    expected_status = context["expected_status"]
+    intent_targets = context["intent_targets"]
+
+    trial_text_norm, trial_tokens = _trial_text_features(trial)
 
-    condition_exact = any(cond and cond in trial_text_norm for cond in expected_condition_norms)
+    condition_exact = any(
+        cond and cond in trial_text_norm for cond in context["expected_condition_norms"]
+    )
     cond_overlap = 0
-    for cond in expected_condition_norms:
-        cond_overlap = max(cond_overlap, len(_tokenize(cond) & trial_tokens))
+    for cond_tokens in context["expected_condition_tokens"]:
+        cond_overlap = max(cond_overlap, len(cond_tokens & trial_tokens))
 
-    query_overlap = len(_tokenize(str(query.get("query") or "")) & trial_tokens)
+    query_overlap = len(context["query_tokens"] & trial_tokens)
     status = str(trial.get("status") or "").strip().upper()
     phases = [str(item).strip().upper() for item in (trial.get("phases") or [])]
     status_match = bool(expected_status and status == expected_status)
     phase_match = bool(expected_phase and expected_phase in phases)
-    location_match = _location_match_score(expected_location, trial.get("locations") or [])
+    locations = trial.get("locations") or []
+    location_match = 0
+    if context["expected_location_norms"] is not None and locations:
+        location_match = _match_location_norms(context["expected_location_norms"], locations)
     intent_match_count = _intent_match_count(
         intent_targets,
         trial_text_norm=trial_text_norm,
@@ -553,7 +653,7 @@ def score_trial_for_query(
         required_checks.append(status_match)
     if expected_phase:
         required_checks.append(phase_match)
-    if _has_expected_location(expected_location):
+    if context["has_expected_location"]:
         required_checks.append(location_match >= 1)
     if intent_targets:
         required_checks.append(intent_match_count >= 1)
@@ -621,12 +721,15 @@ def build_pending_rows(
         if not query_id:
             continue
         candidates = candidates_by_query.get(query_id, [])
+        query_context = build_query_context(query)
         scored: List[Dict[str, Any]] = []
         for trial in candidates:
             pair = (query_id, trial["nct_id"])
             if pair in excluded_pairs:
                 continue
-            score, band, features = score_trial_for_query(query, trial)
+            score, band, features = score_trial_for_query(
+                query, trial, query_context=query_context
+            )
             row = {
                 "query_id": query_id,
                 "nct_id": trial["nct_id"],
@@ -763,6 +866,23 @@ def main() -> None:
     parser.add_argument("--page-size", type=int, default=100)
     parser.add_argument("--page-limit-per-term", type=int, default=2)
     parser.add_argument("--max-candidates-per-query", type=int, default=220)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Queries fetched from CTGov concurrently; output order is unchanged.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="",
+        help="Optional directory for caching CTGov responses across runs",
+    )
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=168.0,
+        help="Reuse cached CTGov responses younger than this (with --cache-dir)",
+    )
     parser.add_argument(
         "--exclude",
         action="append",
@@ -796,6 +916,11 @@ def main() -> None:
         raise ValueError("--max-candidates-per-query must be >= 1")
     if args.target_per_query < 1:
         raise ValueError("--target-per-query must be >= 1")
+    if args.workers < 1:
+        raise ValueError("--workers must be >= 1")
+    if args.cache_ttl_hours < 0:
+        raise ValueError("--cache-ttl-hours must be >= 0")
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
 
     queries = load_jsonl(Path(args.queries))
     exclude_paths: List[Path] = []
@@ -809,19 +934,40 @@ def main() -> None:
             exclude_paths.append(path)
     excluded_pairs = load_excluded_pairs(exclude_paths)
 
-    candidates_by_query: Dict[str, List[Dict[str, Any]]] = {}
+    fetch_ids: List[str] = []
+    fetch_queries: List[Dict[str, Any]] = []
     for query in queries:
         query_id = str(query.get("query_id") or "").strip()
         if not query_id:
             continue
-        candidates_by_query[query_id] = fetch_query_candidates(
-            query=query,
-            base_url=args.ctgov_base_url,
-            timeout_seconds=args.timeout_seconds,
-            page_size=args.page_size,
-            page_limit_per_term=args.page_limit_per_term,
-            max_candidates_per_query=args.max_candidates_per_query * 2,
-        )
+        fetch_ids.append(query_id)
+        fetch_queries.append(query)
+
+    # Fetching is network-bound; queries are independent, so run them on a
+    # thread pool and collect results in input order. One client is shared
+    # so connections to CTGov are reused across queries.
+    with httpx.Client(timeout=args.timeout_seconds) as client:
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+        try:
+            fetched = executor.map(
+                lambda query: fetch_query_candidates(
+                    query=query,
+                    client=client,
+                    base_url=args.ctgov_base_url,
+                    page_size=args.page_size,
+                    page_limit_per_term=args.page_limit_per_term,
+                    max_candidates_per_query=args.max_candidates_per_query * 2,
+                    cache_dir=cache_dir,
+                    cache_ttl_seconds=args.cache_ttl_hours * 3600,
+                ),
+                fetch_queries,
+            )
+            candidates_by_query: Dict[str, List[Dict[str, Any]]] = dict(
+                zip(fetch_ids, fetched)
+            )
+        finally:
+            # Stop queued queries once one fails instead of fetching the rest.
+            executor.shutdown(cancel_futures=True)
 
     pending_rows, pending_summary = build_pending_rows(
         queries=queries,
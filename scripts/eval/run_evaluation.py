@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import argparse
+import copy
 import json
 import math
 import sys
+import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Sequence, Tuple
 
@@ -333,6 +335,16 @@ def _load_predicted_rules_from_jsonl(path: Path) -> Dict[str, List[Dict[str, Any
     return out
 
 
+def _copy_rules(rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Same as generate_llm_predictions._copy_parsed: a reused parse must not
+    # share rule objects or ids with the trial it was parsed for.
+    copied = copy.deepcopy(rules)
+    for rule in copied:
+        if isinstance(rule, dict) and "id" in rule:
+            rule["id"] = f"rule-{uuid.uuid4()}"
+    return copied
+
+
 def generate_predicted_rules(
     trials: Sequence[Dict[str, Any]], predicted_rules_path: str
 ) -> Dict[str, List[Dict[str, Any]]]:
@@ -341,12 +353,19 @@ def generate_predicted_rules(
 
     parse_criteria_v1 = _import_parser()
     predictions: Dict[str, List[Dict[str, Any]]] = {}
+    # Trials can share eligibility text verbatim; parse each distinct text once.
+    parsed_by_text: Dict[str, List[Dict[str, Any]]] = {}
     for trial in trials:
         nct_id = str(trial.get("nct_id") or "").strip()
         text = str(trial.get("eligibility_text") or "")
         if not nct_id:
             continue
-        predictions[nct_id] = parse_criteria_v1(text)
+        rules = parsed_by_text.get(text)
+        if rules is None:
+            rules = parsed_by_text[text] = parse_criteria_v1(text)
+        else:
+            rules = _copy_rules(rules)
+        predictions[nct_id] = rules
     return predictions
 
 
@@ -1,6 +1,16 @@
 from __future__ import annotations
 
-from generate_annotation_tasks import generate_parsing_tasks, generate_retrieval_tasks
+import json
+from pathlib import Path
+
+import pytest
+
+from generate_annotation_tasks import (
+    _load_rows,
+    _validate_relevance_rows,
+    generate_parsing_tasks,
+    generate_retrieval_tasks,
+)
 
 
 def _sample_rows() -> list[dict[str, object]]:
@@ -32,3 +42,34 @@ def test_generate_parsing_tasks_ranks_by_query_support_count() -> None:
     assert manifest["generated_tasks"] == 2
     assert tasks[0]["nct_id"] == "N1"
     assert tasks[0]["query_support_count"] == 2
+
+
+def test_load_rows_normalizes_identifiers(tmp_path: Path) -> None:
+    source = tmp_path / "relevance.jsonl"
+    source.write_text(
+        json.dumps({"query_id": " Q1 ", "nct_id": "N1\t", "relevance_label": 2}) + "\n"
+        + json.dumps({"query_id": 0, "nct_id": 7, "relevance_label": 1}) + "\n",
+        encoding="utf-8",
+    )
+
+    rows = _load_rows(source)
+
+    assert rows[0]["query_id"] == "Q1"
+    assert rows[0]["nct_id"] == "N1"
+    assert rows[1]["query_id"] == "0"
+    assert rows[1]["nct_id"] == "7"
+
+
+
+def test_load_rows_keeps_null_or_missing_ids_invalid(tmp_path: Path) -> None:
+    source = tmp_path / "relevance.jsonl"
+    bad_rows = [
+        {"query_id": None, "nct_id": "N1", "relevance_label": 2},
+        {"query_id": "Q1", "nct_id": None, "relevance_label": 2},
+        {"nct_id": "N1", "relevance_label": 2},
+    ]
+    for row in bad_rows:
+        source.write_text(json.dumps(row) + "\n", encoding="utf-8")
+        rows = _load_rows(source)
+        with pytest.raises(ValueError, match="missing query_id or nct_id"):
+            _validate_relevance_rows(rows)
@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 
 from generate_evaluation_report import (
+    analyze_parsing_errors,
     analyze_retrieval_errors,
     generate_report,
     render_markdown,
@@ -28,6 +29,38 @@ def test_analyze_retrieval_errors_detects_miss_and_top1() -> None:
     assert len(samples) >= 1
 
 
+def test_analyze_parsing_errors_counts_hallucinated_evidence_per_rule() -> None:
+    trials = [{"nct_id": "N1", "eligibility_text": "Adults aged 18-65. No prior chemotherapy."}]
+    age_min = {"type": "INCLUSION", "field": "age", "operator": ">=", "value": 18, "unit": "years"}
+    age_max = {"type": "INCLUSION", "field": "age", "operator": "<=", "value": 65, "unit": "years"}
+    predicted = [
+        {**age_min, "evidence_text": "Adults aged 18-65."},
+        {**age_max, "evidence_text": "Adults aged 18-65."},
+        {
+            "type": "EXCLUSION",
+            "field": "history",
+            "operator": "EXISTS",
+            "value": "radiotherapy",
+            "evidence_text": "Prior radiotherapy.",
+        },
+        {
+            "type": "EXCLUSION",
+            "field": "history",
+            "operator": "EXISTS",
+            "value": "surgery",
+            "evidence_text": "Prior radiotherapy.",
+        },
+    ]
+    counts, _ = analyze_parsing_errors(
+        trials,
+        {"N1": [age_min, age_max]},
+        {"N1": predicted},
+    )
+
+    assert counts["hallucinated_evidence"] == 2
+    assert "parse_false_negative:age" not in counts
+
+
 def test_render_markdown_contains_required_sections() -> None:
     report = {
         "generated_at_utc": "2026-02-06T00:00:00+00:00",
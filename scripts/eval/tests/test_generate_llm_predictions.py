@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+import generate_llm_predictions
+
+
+def _write_jsonl(path: Path, rows: List[Dict[str, Any]]) -> None:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line]
+
+
+def _install_stub_parser(
+    monkeypatch: pytest.MonkeyPatch, fail_first_call: bool = False
+) -> List[str]:
+    calls: List[str] = []
+    lock = threading.Lock()
+
+    def parse(text: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        with lock:
+            calls.append(text)
+            if fail_first_call and len(calls) == 1:
+                raise RuntimeError("llm timeout")
+        # Make the first trial's text the slowest so workers finish out of order.
+        if text == "age >= 18":
+            time.sleep(0.05)
+        rules = [{"id": f"rule-{uuid.uuid4()}", "field": "age", "evidence_text": text}]
+        metadata = {
+            "parser_source": "llm_v1",
+            "fallback_used": False,
+            "llm_usage": {"total_tokens": 10},
+        }
+        return rules, metadata
+
+    monkeypatch.setattr(generate_llm_predictions, "_import_llm_parser", lambda: parse)
+    return calls
+
+
+def _run_main(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    args: List[str],
+) -> Dict[str, Any]:
+    monkeypatch.setattr(sys, "argv", ["generate_llm_predictions.py", *args])
+    generate_llm_predictions.main()
+    out = capsys.readouterr().out
+    # The stats summary is the trailing indented JSON object.
+    return json.loads(out[out.rindex("\n{") + 1 :])
+
+
+def test_main_parses_each_distinct_text_once_and_keeps_input_order(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    calls = _install_stub_parser(monkeypatch)
+    trials_path = tmp_path / "trials.jsonl"
+    output_path = tmp_path / "predictions.jsonl"
+    texts = ["age >= 18", "no pregnancy", "age >= 18", "hba1c < 9", "no pregnancy"]
+    _write_jsonl(
+        trials_path,
+        [{"nct_id": f"NCT{idx}", "eligibility_text": text} for idx, text in enumerate(texts)],
+    )
+
+    stats = _run_main(
+        monkeypatch,
+        capsys,
+        ["--trials", str(trials_path), "--output", str(output_path), "--workers", "3"],
+    )
+
+    rows = _read_jsonl(output_path)
+    assert [row["nct_id"] for row in rows] == [f"NCT{idx}" for idx in range(len(texts))]
+    assert [row["predicted_rules"][0]["evidence_text"] for row in rows] == texts
+    assert sorted(calls) == sorted(set(texts))
+
+    rule_ids = [row["predicted_rules"][0]["id"] for row in rows]
+    assert len(set(rule_ids)) == len(rule_ids)
+    assert rows[0]["parser_metadata"]["llm_usage"] == {"total_tokens": 10}
+    assert "reused_from_text_cache" not in rows[0]["parser_metadata"]
+    assert rows[2]["parser_metadata"]["llm_usage"] is None
+    assert rows[2]["parser_metadata"]["reused_from_text_cache"] is True
+
+    assert stats["written"] == 5
+    assert stats["reused_by_text"] == 2
+    assert stats["token_usage_total"] == 30
+    assert stats["source_llm_v1"] == 5
+    assert stats["rule_count"] == 5
+
+
+def test_main_resume_skips_existing_nct_ids(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    calls = _install_stub_parser(monkeypatch)
+    trials_path = tmp_path / "trials.jsonl"
+    output_path = tmp_path / "predictions.jsonl"
+    _write_jsonl(
+        trials_path,
+        [
+            {"nct_id": "NCT1", "eligibility_text": "age >= 18"},
+            {"nct_id": "NCT2", "eligibility_text": "no pregnancy"},
+            {"nct_id": "NCT3", "eligibility_text": "hba1c < 9"},
+        ],
+    )
+    _write_jsonl(output_path, [{"nct_id": "NCT2", "predicted_rules": [], "parser_metadata": {}}])
+
+    stats = _run_main(
+        monkeypatch,
+        capsys,
+        ["--trials", str(trials_path), "--output", str(output_path), "--resume"],
+    )
+
+    assert [row["nct_id"] for row in _read_jsonl(output_path)] == ["NCT2", "NCT1", "NCT3"]
+    assert calls == ["age >= 18", "hba1c < 9"]
+    assert stats["already_present"] == 1
+    assert stats["written"] == 2
+    assert stats["reused_by_text"] == 0
+    assert stats["token_usage_total"] == 20
+
+
+def test_main_reparses_text_after_failed_parse_instead_of_reusing_it(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    calls = _install_stub_parser(monkeypatch, fail_first_call=True)
+    trials_path = tmp_path / "trials.jsonl"
+    output_path = tmp_path / "predictions.jsonl"
+    _write_jsonl(
+        trials_path,
+        [{"nct_id": f"NCT{idx}", "eligibility_text": "age >= 18"} for idx in range(3)],
+    )
+
+    stats = _run_main(
+        monkeypatch,
+        capsys,
+        ["--trials", str(trials_path), "--output", str(output_path)],
+    )
+
+    rows = _read_jsonl(output_path)
+    assert calls == ["age >= 18", "age >= 18"]
+    assert [row["parser_metadata"]["parser_source"] for row in rows] == [
+        "error",
+        "llm_v1",
+        "llm_v1",
+    ]
+    assert rows[2]["parser_metadata"]["reused_from_text_cache"] is True
+    assert stats["error_count"] == 1
+    assert stats["reused_by_text"] == 1
+    assert stats["token_usage_total"] == 10
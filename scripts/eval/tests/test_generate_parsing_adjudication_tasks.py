@@ -74,3 +74,4 @@ def test_build_parsing_adjudication_tasks_respects_max_trials() -> None:
     assert manifest["disagreement_trial_count"] == 2
     assert manifest["selected_trial_count"] == 1
     assert len(rows) == 1
+    assert rows[0]["nct_id"] == "NCT2"
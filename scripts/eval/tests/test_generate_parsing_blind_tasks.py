@@ -50,3 +50,20 @@ def test_build_blind_tasks_builds_prefixed_rows() -> None:
     assert manifest["shortfall"] == 1
     assert manifest["support_summary"]["min"] == 1
     assert manifest["support_summary"]["max"] == 4
+
+
+def test_build_blind_candidates_keeps_top_candidates_when_capped() -> None:
+    pending_rows = [
+        {"nct_id": "NCT1", "query_support_count": 1},
+        {"nct_id": "NCT2", "query_support_count": 4},
+        {"nct_id": "NCT3", "query_support_count": 4},
+        {"nct_id": "NCT4", "query_support_count": 2},
+    ]
+    candidates, manifest = build_blind_candidates(
+        pending_rows,
+        release_nct_ids=set(),
+        max_candidates=2,
+    )
+
+    assert [row["nct_id"] for row in candidates] == ["NCT2", "NCT3"]
+    assert manifest["unique_candidates"] == 4
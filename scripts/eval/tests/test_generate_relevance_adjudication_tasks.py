@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 from generate_relevance_adjudication_tasks import build_adjudication_tasks
 
 
@@ -84,3 +86,11 @@ def test_build_adjudication_tasks_applies_likely2_quota_per_query() -> None:
 
     assert len(out_rows) == 2
     assert manifest["selected_by_reason"]["likely2_labeled1"] == 2
+
+
+def test_build_adjudication_tasks_validates_labels_without_task_match() -> None:
+    labels = [{"query_id": "Q1", "nct_id": "N9", "relevance_label": 3}]
+    tasks = [{"task_id": "t1", "query_id": "Q1", "nct_id": "N1", "band": "likely_2"}]
+
+    with pytest.raises(ValueError, match=r"labels\[1\] invalid relevance_label: 3"):
+        build_adjudication_tasks(labels=labels, tasks=tasks, ambiguous_task_ids=set())
@@ -67,6 +67,33 @@ def test_build_targeted_batch_respects_quotas_and_exclusion() -> None:
     assert manifest["query_summary"]["Q1"]["shortfall"] == 0
 
 
+def test_build_targeted_batch_keeps_top_scores_when_quotas_exceed_target() -> None:
+    pending_rows = [
+        {"query_id": "Q1", "nct_id": "N1", "band": "likely_2", "heuristic_score": 5.0},
+        {"query_id": "Q1", "nct_id": "N2", "band": "likely_1", "heuristic_score": 9.0},
+        {"query_id": "Q1", "nct_id": "N3", "band": "hard_negative", "heuristic_score": 7.0},
+    ]
+
+    batch, manifest = build_targeted_batch(
+        pending_rows=pending_rows,
+        reference_rows=[],
+        excluded_pairs=set(),
+        focus_queries=["Q1"],
+        label2_counts={},
+        target_per_query=2,
+        likely2_quota=1,
+        likely1_quota=1,
+        hard_negative_quota=1,
+        task_id_prefix="relevance-v2r3",
+    )
+
+    assert [row["nct_id"] for row in batch] == ["N2", "N3"]
+    assert manifest["query_summary"]["Q1"]["picked_band_counts"] == {
+        "hard_negative": 1,
+        "likely_1": 1,
+    }
+
+
 def test_build_blind_rows_removes_scoring_fields() -> None:
     batch_rows = [
         {
@@ -3,12 +3,15 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import httpx
 import pytest
 
 from generate_retrieval_v2_tasks import (
     DEFAULT_EXCLUDE_FILES,
+    build_query_context,
     build_round_batch,
     build_search_terms,
+    fetch_query_candidates,
     load_excluded_pairs,
     score_trial_for_query,
 )
@@ -96,6 +99,33 @@ def test_score_trial_for_query_tracks_intent_feature_matches() -> None:
     assert features["intent_match_count"] >= 2
 
 
+def test_score_trial_for_query_reuses_query_context() -> None:
+    query = {
+        "query": "pediatric asthma prevention",
+        "expected_conditions": ["asthma"],
+        "expected_status": "RECRUITING",
+        "expected_location": {"country": "US", "state": "NY", "city": None},
+    }
+    trials = [
+        {
+            "title": "Asthma prevention in children",
+            "conditions": ["Pediatric Asthma"],
+            "status": "RECRUITING",
+            "locations": [{"country": "United States", "state": "New York", "city": "Albany"}],
+        },
+        {"title": "Adult COPD study", "conditions": ["COPD"], "status": "COMPLETED"},
+    ]
+
+    context = build_query_context(query)
+    for trial in trials:
+        assert score_trial_for_query(query, trial, query_context=context) == score_trial_for_query(
+            query, trial
+        )
+    _, band, features = score_trial_for_query(query, trials[0], query_context=context)
+    assert band == "likely_2"
+    assert features["location_match_score"] == 2
+
+
 def test_build_round_batch_respects_per_query_target_and_fallback() -> None:
     pending_rows = [
         {
@@ -171,6 +201,124 @@ def test_build_round_batch_rejects_quota_sum_above_target() -> None:
         )
 
 
+def _study(nct_id: str) -> dict:
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct_id, "briefTitle": f"Study {nct_id}"},
+            "conditionsModule": {"conditions": ["asthma"]},
+        }
+    }
+
+
+def test_fetch_query_candidates_records_term_hits_with_shared_client() -> None:
+    requested_terms = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        term = request.url.params["query.term"]
+        requested_terms.append(term)
+        studies = [_study("NCT1")]
+        if term == "asthma":
+            studies.append(_study("NCT2"))
+        return httpx.Response(200, json={"studies": studies})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        candidates = fetch_query_candidates(
+            query={"query": "asthma trial", "expected_conditions": ["asthma"]},
+            client=client,
+            base_url="https://ctgov.test/api/v2",
+            page_size=10,
+            page_limit_per_term=1,
+            max_candidates_per_query=10,
+        )
+
+    assert requested_terms == ["asthma trial", "asthma", "pediatric asthma", "childhood asthma"]
+    by_nct = {item["nct_id"]: item for item in candidates}
+    assert by_nct["NCT1"]["term_hits"] == requested_terms
+    assert by_nct["NCT2"]["term_hits"] == ["asthma"]
+
+
+def test_fetch_query_candidates_dedupes_term_hits_across_pages() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = {"studies": [_study("NCT1"), _study("NCT1")]}
+        if "pageToken" not in request.url.params:
+            payload["nextPageToken"] = "page-2"
+        return httpx.Response(200, json=payload)
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        candidates = fetch_query_candidates(
+            query={"query": "migraine", "expected_conditions": ["migraine"]},
+            client=client,
+            base_url="https://ctgov.test/api/v2",
+            page_size=10,
+            page_limit_per_term=2,
+            max_candidates_per_query=10,
+        )
+
+    assert len(candidates) == 1
+    assert candidates[0]["term_hits"] == ["migraine", "chronic migraine", "migraine prevention"]
+
+
+def test_fetch_query_candidates_reuses_cached_responses(tmp_path: Path) -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["query.term"])
+        return httpx.Response(200, json={"studies": [_study("NCT1")]})
+
+    def fetch(ttl_seconds: float) -> list:
+        with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+            return fetch_query_candidates(
+                query={"query": "melanoma"},
+                client=client,
+                base_url="https://ctgov.test/api/v2",
+                page_size=10,
+                page_limit_per_term=1,
+                max_candidates_per_query=10,
+                cache_dir=tmp_path / "cache",
+                cache_ttl_seconds=ttl_seconds,
+            )
+
+    first = fetch(3600)
+    second = fetch(3600)
+    assert calls == ["melanoma"]
+    assert second == first
+
+    fetch(0)
+    assert calls == ["melanoma", "melanoma"]
+
+
+def test_fetch_query_candidates_survives_cache_write_failures(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"studies": [_study("NCT1")]})
+
+    def fetch(cache_dir: Path) -> list:
+        with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+            return fetch_query_candidates(
+                query={"query": "melanoma"},
+                client=client,
+                base_url="https://ctgov.test/api/v2",
+                page_size=10,
+                page_limit_per_term=1,
+                max_candidates_per_query=10,
+                cache_dir=cache_dir,
+                cache_ttl_seconds=3600,
+            )
+
+    blocker = tmp_path / "notadir"
+    blocker.write_text("", encoding="utf-8")
+    assert [row["nct_id"] for row in fetch(blocker / "sub")] == ["NCT1"]
+
+    def failing_replace(src: str, dst: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr("generate_retrieval_v2_tasks.os.replace", failing_replace)
+    cache_dir = tmp_path / "cache"
+    assert [row["nct_id"] for row in fetch(cache_dir)] == ["NCT1"]
+    assert list(cache_dir.iterdir()) == []
+
+
 def test_load_excluded_pairs_reads_query_nct_keys(tmp_path: Path) -> None:
     path = tmp_path / "exclude.jsonl"
     rows = [
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Any, Dict, List
 
 import pytest
 
+import run_evaluation as run_evaluation_module
 from run_evaluation import (
     compute_relevance_coverage,
     compute_hallucination_rate,
     compute_parse_metrics,
     compute_retrieval_metrics,
+    generate_predicted_rules,
     ndcg_at_k,
     rule_signature,
     run_evaluation,
@@ -225,3 +228,29 @@ def test_run_evaluation_rejects_low_relevance_coverage(tmp_path: Path) -> None:
             min_relevance_coverage=1.0,
             predicted_rules_path=str(predicted_rules_path),
         )
+
+
+def test_generate_predicted_rules_parses_shared_text_once_without_sharing_rules(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: List[str] = []
+
+    def parse(text: str) -> List[Dict[str, Any]]:
+        calls.append(text)
+        return [{"id": f"rule-{len(calls)}", "field": "age", "evidence_text": text}]
+
+    monkeypatch.setattr(run_evaluation_module, "_import_parser", lambda: parse)
+    trials = [
+        {"nct_id": "N1", "eligibility_text": "Adults only."},
+        {"nct_id": "N2", "eligibility_text": "Adults only."},
+    ]
+
+    predictions = generate_predicted_rules(trials, "")
+
+    assert calls == ["Adults only."]
+    first, second = predictions["N1"][0], predictions["N2"][0]
+    assert first["id"] != second["id"]
+    assert first is not second
+    assert {k: v for k, v in first.items() if k != "id"} == {
+        k: v for k, v in second.items() if k != "id"
+    }